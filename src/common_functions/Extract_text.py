@@ -0,0 +1,75 @@
+"""
+Text extraction for the supported document types. Kept free of the embedding stack
+(sentence_transformers/torch/faiss) so process-pool workers importing it start quickly,
+even under the Windows spawn start method.
+"""
+import os
+import re
+try:
+    import pymupdf  # C-backed MuPDF: much faster PDF text extraction
+except ImportError:
+    pymupdf = None
+    from PyPDF2 import PdfReader
+from docx import Document
+
+
+
+class _PrintableTable(dict):
+    """
+    str.translate table that deletes characters that are neither printable nor whitespace.
+    Filled lazily per code point, so the Python-level check runs once per distinct character.
+    """
+    def __missing__(self, codepoint: int):
+        char = chr(codepoint)
+        value = codepoint if char.isprintable() or char.isspace() else None
+        self[codepoint] = value
+        return value
+
+
+_PRINTABLE_TABLE = _PrintableTable()
+# The ASCII subset of the same rule (0x1c-0x1f count as whitespace and are kept)
+_ASCII_CONTROL_RE = re.compile(r'[\x00-\x08\x0e-\x1b\x7f]')
+
+
+def _strip_unprintable(text: str) -> str:
+    """Drop characters that are neither printable nor whitespace, without a per-character Python loop."""
+    if text.isascii():
+        return _ASCII_CONTROL_RE.sub('', text)
+    return text.translate(_PRINTABLE_TABLE)
+
+
+def extract_text_from_file(file_path: str) -> str:
+    """
+    Extract text from a supported file.
+    Stateless and in an ML-free module so build_index can fan it out to worker processes.
+    """
+    ext = os.path.splitext(file_path)[1].lower()
+    try:
+        if ext == '.pdf':
+            if pymupdf is not None:
+                with pymupdf.open(file_path) as pdf:
+                    text = '\n'.join(page.get_text() for page in pdf)
+            else:
+                reader = PdfReader(file_path)
+                text = ''.join(page.extract_text() or '' for page in reader.pages)
+            # PDF extraction is the noisy source of control characters
+            text = _strip_unprintable(text)
+        elif ext == '.docx':
+            doc = Document(file_path)
+            text = '\n'.join(para.text for para in doc.paragraphs)
+        elif ext == '.txt':
+            with open(file_path, 'r', encoding='utf-8') as f:
+                text = f.read()
+        else:
+            return ''
+        if not isinstance(text, str):
+            print(f"Non-string text extracted from {file_path}: {type(text)}")
+            return ''
+        if not text.strip():
+            print(f"No valid text after cleaning from {file_path}")
+            return ''
+        print(f"Extracted {len(text)} characters from {file_path}")
+        return text
+    except Exception as e:
+        print(f"Error extracting text from {file_path}: {e}")
+        return ''
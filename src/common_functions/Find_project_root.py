@@ -1,6 +1,9 @@
 import os
+from functools import lru_cache
+
+@lru_cache(maxsize=None)
 def find_project_root(marker_file='pyproject.toml') -> str:
-    """Find the project root by searching upwards for the marker file."""
+    """Find the project root by searching upwards for the marker file (walked once per marker)."""
     current_dir = os.path.dirname(os.path.abspath(__file__))
     while current_dir != os.path.dirname(current_dir):  # Stop at system root
         if os.path.exists(os.path.join(current_dir, marker_file)):
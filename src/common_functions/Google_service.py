@@ -0,0 +1,28 @@
+from functools import lru_cache
+from typing import Any, Optional
+import requests
+from google.auth.transport.requests import Request
+from googleapiclient.discovery import build, build_from_document
+from googleapiclient.discovery_cache import get_static_doc
+
+# Shared token-refresh transport; the pooled session keeps the connection to the token endpoint alive
+AUTH_REQUEST = Request(session=requests.Session())
+
+
+@lru_cache(maxsize=None)
+def _discovery_doc(api: str, version: str) -> Optional[str]:
+    """
+    Load the discovery document bundled with google-api-python-client, once per process.
+    Cached as the raw JSON string: build_from_document mutates the parsed dict while building
+    resources, so each build must parse its own copy rather than share one across threads.
+    """
+    return get_static_doc(api, version) or None
+
+
+def build_service(api: str, version: str, credentials: Any) -> Any:
+    """Build a Google API client without fetching or re-reading the discovery document."""
+    doc = _discovery_doc(api, version)
+    if doc is None:
+        # API not shipped with the client library; fall back to the discovery service.
+        return build(api, version, credentials=credentials)
+    return build_from_document(doc, credentials=credentials)
@@ -0,0 +1,56 @@
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeoutError
+from functools import lru_cache
+from typing import Any, Callable, List, Optional, Tuple
+
+# Same logger the tools configure through utils.logger.setup_logger
+logger = logging.getLogger("AIAssistant")
+
+
+@lru_cache(maxsize=None)
+def open_disk_cache(directory: str) -> Optional[Any]:
+    """One diskcache.Cache per directory for the whole process; None if diskcache is unavailable."""
+    try:
+        import diskcache
+        return diskcache.Cache(directory)
+    except Exception as e:
+        logger.warning(f"Persistent cache at {directory} disabled: {str(e)}")
+        return None
+
+
+def race_providers(providers: List[Tuple[str, Callable, str]], prompt: str, parse: Callable[[str], Any],
+                   timeout: float, attempts: int = 2, **call_kwargs) -> Any:
+    """
+    Query every (name, call, api_key) provider concurrently and return the first reply that
+    parse() turns into a truthy result, retrying up to `attempts` rounds of `timeout` seconds.
+    Providers without an API key are skipped; None if no reply parses.
+    """
+    providers = [(name, call, key) for name, call, key in providers if key]
+    if not providers:
+        logger.warning("No LLM provider has an API key configured")
+        return None
+    for attempt in range(attempts):
+        logger.info(f"Attempting LLM call #{attempt + 1}")
+        executor = ThreadPoolExecutor(max_workers=len(providers))
+        try:
+            futures = {executor.submit(call, prompt, key, **call_kwargs): name for name, call, key in providers}
+            for future in as_completed(futures, timeout=timeout):
+                name = futures[future]
+                response = future.result()
+                if not response:
+                    continue
+                try:
+                    result = parse(response)
+                except json.JSONDecodeError as e:
+                    logger.warning(f"{name} JSON decode error: {str(e)}")
+                    continue
+                if result:
+                    logger.info(f"Successfully parsed {name} response")
+                    return result
+        except FuturesTimeoutError:
+            logger.warning(f"No valid response from {', '.join(futures.values())} within {timeout}s")
+        finally:
+            # Don't wait on the slower provider once a result is in hand
+            executor.shutdown(wait=False, cancel_futures=True)
+    return None
@@ -9,8 +9,7 @@ import os
 from firebase_client import set_initial_profile, is_profile_complete
 from dotenv import load_dotenv
 import json
-from routes.events import get_google_creds as get_google_creds_events
-from routes.tasks import get_google_creds as get_google_creds_tasks
+from routes.events import get_google_creds
 from firebase_client import get_user_profile, set_user_profile
 from firebase_admin import auth
 load_dotenv()
@@ -48,12 +47,6 @@ flow = Flow.from_client_config(
     redirect_uri="http://localhost:8000/auth/callback"
 )
 
-def get_google_creds(uid: str) -> Credentials:
-    try:
-        return get_google_creds_events(uid)
-    except HTTPException:
-        return get_google_creds_tasks(uid)
-
 auth_router = APIRouter(prefix="/auth")
 
 class LoginRequest(BaseModel):
@@ -2,9 +2,8 @@
 from fastapi import APIRouter, Depends, HTTPException
 from typing import Optional, List, Dict
 from firebase_client import get_current_uid
-from googleapiclient.discovery import build
+from common_functions.Google_service import AUTH_REQUEST, build_service
 from google.oauth2.credentials import Credentials
-from google.auth.transport.requests import Request
 from firebase_client import db
 from typing import Dict
 import os
@@ -40,7 +39,7 @@ def get_google_creds(uid: str) -> Credentials:
     
     if creds.expired and creds.refresh_token:
         try:  # NEW: Catch refresh errors
-            creds.refresh(Request())
+            creds.refresh(AUTH_REQUEST)
             new_tokens = {
                 'access_token': creds.token,
                 'expiry': creds.expiry.isoformat() if creds.expiry else None
@@ -71,7 +70,7 @@ async def list_events(
 ):
     try:
         creds = get_google_creds(uid)
-        service = build('calendar', 'v3', credentials=creds)
+        service = build_service('calendar', 'v3', creds)
         
         params = {
             'calendarId': calendarId,
@@ -102,7 +101,7 @@ async def list_events(
 async def get_event(calendarId: str, eventId: str, uid: str = Depends(get_current_uid)):
     try:
         creds = get_google_creds(uid)
-        service = build('calendar', 'v3', credentials=creds)
+        service = build_service('calendar', 'v3', creds)
         event = service.events().get(calendarId=calendarId, eventId=eventId).execute()
         return event
     except Exception as e:
@@ -119,7 +118,7 @@ async def create_event(
 ):
     try:
         creds = get_google_creds(uid)
-        service = build('calendar', 'v3', credentials=creds)
+        service = build_service('calendar', 'v3', creds)
         
         event = service.events().insert(
             calendarId=calendarId,
@@ -145,7 +144,7 @@ async def patch_event(
 ):
     try:
         creds = get_google_creds(uid)
-        service = build('calendar', 'v3', credentials=creds)
+        service = build_service('calendar', 'v3', creds)
         
         event = service.events().patch(
             calendarId=calendarId,
@@ -172,7 +171,7 @@ async def update_event_full(
 ):
     try:
         creds = get_google_creds(uid)
-        service = build('calendar', 'v3', credentials=creds)
+        service = build_service('calendar', 'v3', creds)
         
         event = service.events().update(
             calendarId=calendarId,
@@ -196,7 +195,7 @@ async def delete_event_api(
 ):
     try:
         creds = get_google_creds(uid)
-        service = build('calendar', 'v3', credentials=creds)
+        service = build_service('calendar', 'v3', creds)
         
         service.events().delete(
             calendarId=calendarId,
@@ -216,7 +215,7 @@ async def quick_add_event(
 ):
     try:
         creds = get_google_creds(uid)
-        service = build('calendar', 'v3', credentials=creds)
+        service = build_service('calendar', 'v3', creds)
         
         event = service.events().quickAdd(
             calendarId=calendarId,
@@ -231,7 +230,7 @@ async def quick_add_event(
 async def bulk_events(body: List[Dict], uid: str = Depends(get_current_uid)):
     try:
         creds = get_google_creds(uid)
-        service = build('calendar', 'v3', credentials=creds)
+        service = build_service('calendar', 'v3', creds)
         
         results = []
         errors = []
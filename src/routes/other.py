@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends
 from firebase_client import get_current_uid
-from googleapiclient.discovery import build
+from common_functions.Google_service import build_service
 from routes.auth import get_google_creds
 
 other_router = APIRouter(prefix="/api")
@@ -8,20 +8,20 @@ other_router = APIRouter(prefix="/api")
 @other_router.get("/calendars")
 async def list_calendars(uid: str = Depends(get_current_uid)):
     creds = get_google_creds(uid)
-    service = build('calendar', 'v3', credentials=creds)
+    service = build_service('calendar', 'v3', creds)
     calendars = service.calendarList().list().execute()
     return calendars.get('items', [])
 
 @other_router.get("/people/suggest")
 async def suggest_people(query: str, uid: str = Depends(get_current_uid)):
     creds = get_google_creds(uid)
-    service = build('people', 'v1', credentials=creds)
+    service = build_service('people', 'v1', creds)
     results = service.people().searchContacts(query=query, readMask='names,emailAddresses').execute()
     return results.get('results', [])
 
 @other_router.get("/timezones")
 async def get_timezones(uid: str = Depends(get_current_uid)):
     creds = get_google_creds(uid)
-    service = build('calendar', 'v3', credentials=creds)
+    service = build_service('calendar', 'v3', creds)
     timezones = service.settings().get(setting='timeZone').execute()
     return timezones
\ No newline at end of file
@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends
 from typing import Optional
 from firebase_client import get_current_uid
-from googleapiclient.discovery import build
+from common_functions.Google_service import build_service
 import uuid
 from firebase_admin import firestore
 from firebase_client import db
@@ -11,7 +11,7 @@ sync_router = APIRouter(prefix="/api/sync")
 @sync_router.post("/subscribe")
 async def subscribe_sync(calendarId: str = 'primary', uid: str = Depends(get_current_uid)):
     creds = get_google_creds(uid)
-    service = build('calendar', 'v3', credentials=creds)
+    service = build_service('calendar', 'v3', creds)
     channel_id = str(uuid.uuid4())
     body = {
         'id': channel_id,
@@ -31,7 +31,7 @@ async def subscribe_sync(calendarId: str = 'primary', uid: str = Depends(get_cur
 @sync_router.post("/unsubscribe")
 async def unsubscribe_sync(channel_id: str, resource_id: str, uid: str = Depends(get_current_uid)):
     creds = get_google_creds(uid)
-    service = build('calendar', 'v3', credentials=creds)
+    service = build_service('calendar', 'v3', creds)
     body = {
         'id': channel_id,
         'resourceId': resource_id
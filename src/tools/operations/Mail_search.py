@@ -3,7 +3,7 @@ import logging
 from typing import Tuple, List, Dict, Optional
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
-from google.auth.transport.requests import Request
+from common_functions.Google_service import AUTH_REQUEST
 from google_auth_oauthlib.flow import InstalledAppFlow
 from google.oauth2.credentials import Credentials
 import base64
@@ -35,7 +35,7 @@ def get_gmail_service(project_root: Optional[str] = None):
     if not creds or not creds.valid:
         if creds and creds.expired and creds.refresh_token:
             logger.info("Refreshing expired token")
-            creds.refresh(Request())
+            creds.refresh(AUTH_REQUEST)
         else:
             if not os.path.exists(client_secret_file):
                 logger.error(f"❌ client_secret.json missing at {client_secret_file}")
@@ -1,15 +1,21 @@
-from googleapiclient.discovery import build
+from common_functions.Google_service import AUTH_REQUEST, build_service
 from google.oauth2.credentials import Credentials
-from google.auth.transport.requests import Request
 from firebase_client import db
-from typing import Optional, List, Dict, Tuple
+from typing import Any, Optional, List, Dict, Tuple
 import json
-import os
 from dotenv import load_dotenv
-from datetime import datetime
 
 load_dotenv()
 
+# Response templates, kept as module constants so the hot paths only do a str.format call
+_TASK_CREATED = "Task created: {0}"
+_TASK_UPDATED = "Task {0} updated"
+_TASK_DELETED = "Task {0} deleted"
+_CREATE_FAILED = "Failed to create task: {0}"
+_READ_FAILED = "Failed to fetch tasks: {0}"
+_UPDATE_FAILED = "Failed to update task: {0}"
+_DELETE_FAILED = "Failed to delete task: {0}"
+
 def get_google_creds(uid: str) -> Credentials:
     """Retrieve and refresh Google Calendar credentials for the given user ID."""
     if uid is None:
@@ -36,7 +42,7 @@ def get_google_creds(uid: str) -> Credentials:
         )
         if creds.expired and creds.refresh_token:
             try:
-                creds.refresh(Request())
+                creds.refresh(AUTH_REQUEST)
                 new_tokens = {
                     'access_token': creds.token,
                     'expiry': creds.expiry.isoformat() if creds.expiry else None
@@ -72,7 +78,7 @@ def create_task(
         return False, "Title and date are required for creating a task."
     try:
         creds = get_google_creds(uid)
-        service = build('calendar', 'v3', credentials=creds)
+        service: Any = build_service('calendar', 'v3', creds)
         
         # Determine if all-day or timed event
         is_all_day = not (start_time and end_time)
@@ -92,7 +98,7 @@ def create_task(
         color_map = {"High": "11", "Medium": "6", "Low": "10"}
         color_id = color_map.get(priority, "6")  # Default to Medium
         
-        event_body = {
+        event_body: Dict[str, Any] = {
             'summary': title,
             'description': description or '',
             'start': start,
@@ -124,11 +130,11 @@ def create_task(
             calendarId='primary',
             body=event_body
         ).execute()
-        return True, f"Task created: {event['id']}"
+        return True, _TASK_CREATED.format(event['id'])
     except ValueError as ve:
         return False, str(ve)
     except Exception as e:
-        return False, f"Failed to create task: {str(e)}"
+        return False, _CREATE_FAILED.format(e)
 
 def read_task(
     status: Optional[str] = None,
@@ -139,8 +145,8 @@ def read_task(
         return False, "User ID (uid) is required to read tasks."
     try:
         creds = get_google_creds(uid)
-        service = build('calendar', 'v3', credentials=creds)
-        params = {
+        service: Any = build_service('calendar', 'v3', creds)
+        params: Dict[str, Any] = {
             'calendarId': 'primary',
             'maxResults': 100,
             'singleEvents': True,
@@ -148,7 +154,7 @@ def read_task(
         }
         events_result = service.events().list(**params).execute()
         items = events_result.get('items', [])
-        tasks = []
+        tasks: List[Dict[str, Any]] = []
         color_to_priority = {"11": "High", "6": "Medium", "10": "Low"}
         for event in items:
             ext = event.get('extendedProperties', {}).get('private', {})
@@ -181,7 +187,7 @@ def read_task(
     except ValueError as ve:
         return False, str(ve)
     except Exception as e:
-        return False, f"Failed to fetch tasks: {str(e)}"
+        return False, _READ_FAILED.format(e)
 
 def update_task(
     task_id: str,
@@ -203,9 +209,9 @@ def update_task(
         return False, "User ID (uid) is required to update a task."
     try:
         creds = get_google_creds(uid)
-        service = build('calendar', 'v3', credentials=creds)
-        current_event = service.events().get(calendarId='primary', eventId=task_id).execute()
-        body = {}
+        service: Any = build_service('calendar', 'v3', creds)
+        current_event: Dict[str, Any] = service.events().get(calendarId='primary', eventId=task_id).execute()
+        body: Dict[str, Any] = {}
         if title:
             body['summary'] = title
         if description is not None:
@@ -228,7 +234,7 @@ def update_task(
             body['start'] = {'date': new_date} if is_all_day else {'dateTime': f"{new_date}T{start_time or '00:00'}:00"}
             body['end'] = {'date': new_date} if is_all_day else {'dateTime': f"{new_date}T{end_time or '23:59'}:00"}
         # Extended properties
-        ext_update = {}
+        ext_update: Dict[str, str] = {}
         if status:
             ext_update['status'] = status
         if priority:
@@ -243,16 +249,16 @@ def update_task(
             body['extendedProperties'] = {'private': new_ext}
         if not body:
             return False, "No updates provided"
-        event = service.events().patch(
+        service.events().patch(
             calendarId='primary',
             eventId=task_id,
             body=body
         ).execute()
-        return True, f"Task {task_id} updated"
+        return True, _TASK_UPDATED.format(task_id)
     except ValueError as ve:
         return False, str(ve)
     except Exception as e:
-        return False, f"Failed to update task: {str(e)}"
+        return False, _UPDATE_FAILED.format(e)
 
 def mark_complete(
     task_id: str,
@@ -272,16 +278,16 @@ def delete_task(
         return False, "User ID (uid) is required to delete a task."
     try:
         creds = get_google_creds(uid)
-        service = build('calendar', 'v3', credentials=creds)
+        service: Any = build_service('calendar', 'v3', creds)
         service.events().delete(
             calendarId='primary',
             eventId=task_id
         ).execute()
-        return True, f"Task {task_id} deleted"
+        return True, _TASK_DELETED.format(task_id)
     except ValueError as ve:
         return False, str(ve)
     except Exception as e:
-        return False, f"Failed to delete task: {str(e)}"
+        return False, _DELETE_FAILED.format(e)
 
 # Remove the hardcoded test code from __main__
 if __name__ == "__main__":
@@ -1,18 +1,30 @@
 import os
 import sys
 import tempfile
-import pandas as pd
 from datetime import datetime
 import warnings
 import json
-import requests
+import codecs
 import re
 from dotenv import load_dotenv
-import subprocess
 import platform
 import shutil
-import zipfile
-from pathlib import Path
+import hashlib
+import threading
+import time
+from functools import lru_cache
+
+try:
+    import orjson
+    _json_loads = orjson.loads  # raises orjson.JSONDecodeError, a json.JSONDecodeError subclass
+
+    def _json_dumps_pretty(obj) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+except ImportError:
+    _json_loads = json.loads
+
+    def _json_dumps_pretty(obj) -> bytes:
+        return json.dumps(obj, indent=2).encode('utf-8')
 
 # Add src/ to sys.path to fix module discovery for absolute imports
 script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -22,8 +34,6 @@ if src_dir not in sys.path:
 
 # Suppress syntax warnings (no longer from PBI_dashboard_creator)
 warnings.filterwarnings("ignore", category=SyntaxWarning)
-from common_functions.Find_project_root import find_project_root
-# No sys.path adjustment needed for standalone, as we're removing PBI import
 
 # PBI functions are unavailable; always use manual fallback
 PBI_FUNCTIONS_AVAILABLE = False
@@ -33,6 +43,7 @@ try:
     from utils.logger import setup_logger
     from common_functions.Find_project_root import find_project_root
 except ImportError:
+    @lru_cache(maxsize=None)
     def setup_logger():
         import logging
         logger = logging.getLogger("AIAssistant")
@@ -48,6 +59,7 @@ except ImportError:
             logger.addHandler(console_handler)
         return logger
     
+    @lru_cache(maxsize=None)
     def find_project_root(marker_files=None):
         """
         Fallback: Walk up the directory tree to find the project root based on marker files.
@@ -67,34 +79,51 @@ except ImportError:
         
         raise ValueError("Project root not found. Ensure a marker file like 'README.md' exists at the root.")
 
+from common_functions.LLM_utils import open_disk_cache, race_providers
+
 logger = setup_logger()
 PROJECT_ROOT = find_project_root()
 
-# Load .env file dynamically from project root
+# .env file lives at the project root; it is loaded on first use rather than at import
 env_path = os.path.join(PROJECT_ROOT, '.env')
-if not os.path.exists(env_path):
-    logger.error(f".env file not found at {env_path}")
-    sys.exit(1)
-load_dotenv(env_path)
-logger.info(f"Loaded .env file from {env_path}")
 
+@lru_cache(maxsize=1)
+def _ensure_env() -> bool:
+    """Load the project .env once per process; False if it is missing."""
+    if not os.path.exists(env_path):
+        logger.error(f".env file not found at {env_path}")
+        return False
+    load_dotenv(env_path)
+    logger.info(f"Loaded .env file from {env_path}")
+    return True
+
+@lru_cache(maxsize=1)
 def check_powerbi_installation():
-    """Check if Power BI Desktop is installed on the system."""
+    """Check if Power BI Desktop is installed on the system (probed once per process)."""
     try:
         if platform.system() == "Windows":
-            # Common Power BI installation paths
+            # Common Power BI installation paths, resolved from the environment rather than assuming C:\
+            program_files = os.environ.get("ProgramFiles", r"C:\Program Files")
+            program_files_x86 = os.environ.get("ProgramFiles(x86)", r"C:\Program Files (x86)")
+            local_app_data = os.environ.get("LOCALAPPDATA", os.path.join(os.path.expanduser("~"), "AppData", "Local"))
             possible_paths = [
-                r"C:\Program Files\Microsoft Power BI Desktop\bin\PBIDesktop.exe",
-                r"C:\Program Files (x86)\Microsoft Power BI Desktop\bin\PBIDesktop.exe",
-                r"C:\Users\{}\AppData\Local\Microsoft\WindowsApps\Microsoft.MicrosoftPowerBIDesktop_8wekyb3d8bbwe\PBIDesktop.exe".format(os.getenv('USERNAME'))
+                os.path.join(program_files, "Microsoft Power BI Desktop", "bin", "PBIDesktop.exe"),
+                os.path.join(program_files_x86, "Microsoft Power BI Desktop", "bin", "PBIDesktop.exe"),
+                os.path.join(local_app_data, "Microsoft", "WindowsApps", "Microsoft.MicrosoftPowerBIDesktop_8wekyb3d8bbwe", "PBIDesktop.exe")
             ]
             
             for path in possible_paths:
-                if os.path.exists(path):
+                if os.path.isfile(path):
                     logger.info(f"Power BI Desktop found at: {path}")
                     return True, path
             
-            logger.warning("Power BI Desktop not found in common installation paths")
+            # Custom install locations are only reachable through PATH
+            path = shutil.which("PBIDesktop.exe")
+            if path:
+                logger.info(f"Power BI Desktop found on PATH: {path}")
+                return True, path
+            
+            logger.warning("Power BI Desktop not found in common installation paths or on PATH")
             return False, None
         else:
             logger.warning("Power BI Desktop is only available on Windows")
@@ -103,82 +132,357 @@ def check_powerbi_installation():
         logger.error(f"Error checking Power BI installation: {str(e)}")
         return False, None
 
-def call_grok(prompt: str, api_key: str) -> str:
-    """Call Grok API directly."""
+# Stable part of the visual-plan prompt; only the dataset/query message changes per call
+PLAN_INSTRUCTIONS = """You are a Power BI expert. Generate a JSON configuration for a dashboard based on the user's request.
+The user message is a JSON object with the request ("query") and the CSV schema ("schema"), one "column(dtype, ex=example value)" entry per column.
+
+Return ONLY a valid JSON object with this exact structure:
+{
+  "visuals": [
+    {
+      "type": "bar",
+      "x_field": "column_name",
+      "y_field": "column_name",
+      "aggregation": "sum",
+      "filters": {}
+    }
+  ],
+  "slicers": ["column_name1", "column_name2"]
+}
+
+Visual types: bar, line, pie, card
+Aggregations: sum, count, avg, min, max
+Choose appropriate fields from the available columns.
+Return only the JSON, no explanation."""
+
+CSV_SAMPLE_ROWS = 3  # Rows shown to the LLM; the plan only needs the header and a few examples
+CSV_SNIFF_BYTES = 64 * 1024
+PLAN_CACHE_TTL = 24 * 60 * 60  # seconds
+PLAN_SIMILARITY_THRESHOLD = 0.95
+PLAN_EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+
+class SemanticPlanCache:
+    """
+    In-process cache of dashboard plans, scoped to a CSV schema.
+    Exact query matches are dict lookups; otherwise a cached plan is reused when the query
+    embedding's cosine similarity to a cached query reaches the threshold.
+    """
+    def __init__(self, threshold: float = PLAN_SIMILARITY_THRESHOLD, ttl: float = PLAN_CACHE_TTL):
+        self.threshold = threshold
+        self.ttl = ttl
+        self._entries = {}  # schema hash -> {normalized query: (timestamp, embedding or None until needed, plan)}
+        self._model = None
+        self._model_failed = False
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def schema_hash(columns: list) -> str:
+        return hashlib.sha256("\x1f".join(sorted(map(str, columns))).encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def _normalize(query: str) -> str:
+        return " ".join(query.lower().split())
+
+    def _embed(self, texts: list):
+        """Unit-length embeddings, one row per text, or None if sentence-transformers is unavailable."""
+        if self._model is None and not self._model_failed:
+            try:
+                from sentence_transformers import SentenceTransformer
+                self._model = SentenceTransformer(PLAN_EMBEDDING_MODEL)
+            except Exception as e:
+                logger.warning(f"Semantic plan cache disabled: {str(e)}")
+                self._model_failed = True
+        if self._model is None:
+            return None
+        return self._model.encode(texts, normalize_embeddings=True)
+
+    def get(self, columns: list, query: str):
+        schema = self.schema_hash(columns)
+        normalized = self._normalize(query)
+        now = time.time()
+        with self._lock:
+            entries = self._entries.get(schema, {})
+            for key in [k for k, (ts, _, _) in entries.items() if now - ts > self.ttl]:
+                del entries[key]
+            if not entries:
+                return None
+            if normalized in entries:
+                return dict(entries[normalized][2])
+            candidates = [(key, emb, plan) for key, (_, emb, plan) in entries.items()]
+        # Stored queries are embedded here, on the first lookup that needs them, never on put
+        missing = [key for key, emb, _ in candidates if emb is None]
+        embeddings = self._embed([normalized] + missing)
+        if embeddings is None:
+            return None
+        query_emb = embeddings[0]
+        fresh = dict(zip(missing, embeddings[1:]))
+        if fresh:
+            with self._lock:
+                for key, emb in fresh.items():
+                    if key in entries:
+                        ts, _, plan = entries[key]
+                        entries[key] = (ts, emb, plan)
+        best_score, best_plan = max(((float(query_emb @ (emb if emb is not None else fresh[key])), plan)
+                                     for key, emb, plan in candidates), key=lambda c: c[0])
+        if best_score >= self.threshold:
+            logger.info(f"Semantic plan cache hit (similarity {best_score:.3f})")
+            return dict(best_plan)
+        return None
+
+    def put(self, columns: list, query: str, plan: dict):
+        # Only the text is kept; embedding it here would load the model even if no lookup follows
+        with self._lock:
+            self._entries.setdefault(self.schema_hash(columns), {})[self._normalize(query)] = (time.time(), None, dict(plan))
+
+_PLAN_CACHE = SemanticPlanCache()
+
+PLAN_DISK_CACHE_TTL = 14 * 24 * 60 * 60  # seconds
+
+PLAN_DISK_CACHE_DIR = os.path.join(PROJECT_ROOT, '.cache', 'pbi_plans')  # plans persisted across runs
+
+def _plan_cache_key(columns: list, query: str) -> str:
+    """Order-insensitive in the columns and case/whitespace-insensitive in the query."""
+    payload = json.dumps([sorted(map(str, columns)), query.strip().lower()])
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=16).hexdigest()
+
+@lru_cache(maxsize=None)
+def _groq_client(api_key: str):
+    """One Groq client (and HTTP connection pool) per API key for the whole process."""
+    from groq import Groq
+    return Groq(api_key=api_key)
+
+@lru_cache(maxsize=None)
+def _gemini_model(api_key: str, system: str = None):
+    """Configure Gemini once per key and reuse the model object."""
+    import google.generativeai as genai
+    genai.configure(api_key=api_key)
+    return genai.GenerativeModel(
+        "gemini-1.5-flash-latest",
+        system_instruction=system,
+        generation_config={"response_mime_type": "application/json"}
+    )
+
+class _JsonObjectScanner:
+    """Tracks brace depth outside string literals to spot where the first streamed JSON object closes."""
+    def __init__(self):
+        self.depth = 0
+        self.started = False
+        self.in_string = False
+        self.escaped = False
+
+    def feed(self, text: str) -> int:
+        """Consume the next chunk; index in it of the brace closing the first top-level object, else -1."""
+        for i, ch in enumerate(text):
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif ch == '\\':
+                    self.escaped = True
+                elif ch == '"':
+                    self.in_string = False
+            elif ch == '{':
+                self.depth += 1
+                self.started = True
+            elif not self.started:
+                continue  # prose or code fence before the object
+            elif ch == '"':
+                self.in_string = True
+            elif ch == '}':
+                self.depth -= 1
+                if self.depth == 0:
+                    return i
+        return -1
+
+def _extract_json_object(text: str) -> str:
+    """First balanced {...} object in text (braces inside strings ignored), or None if it never closes."""
+    start = text.find('{')
+    if start < 0:
+        return None
+    end = _JsonObjectScanner().feed(text[start:])
+    return text[start:start + end + 1] if end >= 0 else None
+
+def call_grok(prompt: str, api_key: str, system: str = None) -> str:
+    """Call Grok API directly in JSON mode."""
     try:
-        from groq import Groq
-        client = Groq(api_key=api_key)
+        client = _groq_client(api_key)
+        messages = [{"role": "user", "content": prompt}]
+        if system:
+            messages.insert(0, {"role": "system", "content": system})
+        # JSON mode ends the completion at the closing brace; Groq does not stream in this mode
         response = client.chat.completions.create(
             model="llama-3.3-70b-versatile",
-            messages=[{"role": "user", "content": prompt}],
+            messages=messages,
             max_tokens=1500,
-            temperature=0.3
+            temperature=0.3,
+            response_format={"type": "json_object"}
         )
         return response.choices[0].message.content
     except Exception as e:
         logger.warning(f"Grok API failed: {str(e)}")
         return None
 
-def call_gemini(prompt: str, api_key: str) -> str:
-    """Call Gemini API as fallback."""
+def call_gemini(prompt: str, api_key: str, system: str = None) -> str:
+    """Call Gemini API as fallback, streaming until the JSON plan is complete."""
     try:
-        import google.generativeai as genai
-        genai.configure(api_key=api_key)
-        model = genai.GenerativeModel("gemini-1.5-flash-latest")
-        response = model.generate_content(prompt)
-        return response.text
+        model = _gemini_model(api_key, system)
+        parts = []
+        scanner = _JsonObjectScanner()
+        for chunk in model.generate_content(prompt, stream=True):
+            parts.append(chunk.text)
+            if scanner.feed(chunk.text) >= 0:
+                break
+        return "".join(parts)
     except Exception as e:
         logger.warning(f"Gemini API failed: {str(e)}")
         return None
 
-def clean_llm_response(response: str) -> str:
-    """Clean LLM response to extract JSON."""
+# Markdown fences around LLM replies
+_RE_FENCE = re.compile(r'^```(?:json)?\s*|\s*```$', re.MULTILINE)
+
+def parse_llm_json(response: str):
+    """Parse the JSON object in an LLM response, trying the cheap paths first."""
     if not response:
         return None
     
     logger.debug(f"Raw LLM response: {response[:500]}...")
     
-    # Remove markdown code blocks
-    response = re.sub(r'^```json\s*|\s*```$', '', response.strip(), flags=re.MULTILINE)
-    response = re.sub(r'^```\s*|\s*```$', '', response.strip(), flags=re.MULTILINE)
+    # JSON-mode replies are already bare JSON; only try that when it can possibly succeed
     response = response.strip()
+    if response.startswith('{') and response.endswith('}'):
+        try:
+            return _json_loads(response)
+        except json.JSONDecodeError:
+            pass
     
-    # Try to find JSON within the response
-    json_match = re.search(r'\{.*\}', response, re.DOTALL)
-    if json_match:
-        json_str = json_match.group(0)
+    # Remove markdown code blocks
+    stripped = _RE_FENCE.sub('', response).strip()
+    try:
+        return _json_loads(stripped)
+    except json.JSONDecodeError:
+        pass
+    
+    # Try to find JSON within surrounding prose
+    json_str = _extract_json_object(stripped)
+    if json_str:
         logger.debug(f"Extracted JSON: {json_str[:200]}...")
-        return json_str
+        return _json_loads(json_str)
     
     logger.warning(f"No JSON found in response: {response[:200]}...")
     return None
 
-def create_fallback_dashboard_config(columns: list, query: str) -> dict:
-    """Create a fallback dashboard configuration when LLM fails."""
+def detect_csv_encoding(csv_path: str) -> str:
+    """Guess the CSV encoding from its first CSV_SNIFF_BYTES bytes, defaulting to UTF-8."""
+    with open(csv_path, 'rb') as f:
+        head = f.read(CSV_SNIFF_BYTES)
+    if not head:
+        return 'utf-8'
+    # Accept UTF-8 up front when the head decodes strictly. A multi-byte character cut off at
+    # the sniff boundary is tolerated here, whereas charset-normalizer would reject UTF-8 for it.
+    try:
+        codecs.getincrementaldecoder('utf-8')().decode(head, final=len(head) < CSV_SNIFF_BYTES)
+        return 'utf-8'
+    except UnicodeDecodeError:
+        pass
+    try:
+        from charset_normalizer import from_bytes
+        # One pass over the whole sniffed block rather than the default five 512-byte probes
+        best = from_bytes(head, steps=1, chunk_size=len(head)).best()
+        if best is not None:
+            return best.encoding
+    except ImportError:
+        logger.warning("charset-normalizer not installed; assuming UTF-8 CSV encoding")
+    return 'utf-8'
+
+def validate_dashboard_plan(plan, columns: list) -> dict:
+    """Drop visuals and slicers that reference columns missing from the CSV; None if no visual survives."""
+    if not isinstance(plan, dict):
+        return None
+    col_set = frozenset(columns)
+    visuals = []
+    visuals_in = plan.get('visuals')
+    if not isinstance(visuals_in, list):
+        return None
+    for visual in visuals_in:
+        if not isinstance(visual, dict):
+            continue
+        fields = [visual.get(key) for key in ('x_field', 'y_field') if visual.get(key)]
+        # LLMs occasionally emit lists/objects here; only plain column names can be valid
+        if fields and all(isinstance(field, str) and field in col_set for field in fields):
+            visuals.append(visual)
+        else:
+            logger.warning(f"Dropping visual with unknown fields: {visual}")
+    if not visuals:
+        return None
+    plan['visuals'] = visuals
+    slicers = plan.get('slicers')
+    if not isinstance(slicers, list):
+        slicers = []
+    plan['slicers'] = [slicer for slicer in slicers if isinstance(slicer, str) and slicer in col_set]
+    return plan
+
+def describe_columns(df) -> list:
+    """Compact per-column schema for the prompt: name, dtype and one example value."""
+    schema = []
+    for col in df.columns:
+        values = df[col].dropna()
+        example = values.iloc[0] if len(values) else None
+        if hasattr(example, 'item'):
+            example = example.item()  # numpy scalar -> plain Python for a clean repr
+        schema.append(f"{col}({df[col].dtype}, ex={example!r})")
+    return schema
+
+PLAN_CALL_TIMEOUT = 30  # seconds per round before giving up on both providers
+
+def request_dashboard_plan(prompt: str, columns: list, grok_api_key: str, gemini_api_key: str, attempts: int = 2) -> dict:
+    """Query Grok and Gemini concurrently and return the first reply that yields a valid plan."""
+    return race_providers(
+        [("Grok", call_grok, grok_api_key), ("Gemini", call_gemini, gemini_api_key)],
+        prompt,
+        lambda response: validate_dashboard_plan(parse_llm_json(response), columns),
+        timeout=PLAN_CALL_TIMEOUT,
+        attempts=attempts,
+        system=PLAN_INSTRUCTIONS
+    )
+
+# Integer columns named by one of these words are periods (year, month, ...) rather than measures;
+# anchored to separators so names like "runtime" or "num_candidates" stay measures
+_DATE_NAME_RE = re.compile(r'(?:^|[_\s-])(?:date|time|year|month|day)(?:[_\s-]|$)', re.IGNORECASE)
+# Integer columns named "id" or "*_id" are identifiers (categories), not measures to aggregate
+_ID_NAME_RE = re.compile(r'(?:^|[_\s-])id$', re.IGNORECASE)
+# Chart types requested in the query; no trailing \b so plurals like "bars" and "trends" still match
+_INTENT_RE = re.compile(r'\b(bar|column|line|trend|pie|donut)', re.IGNORECASE)
+DATE_PARSE_RATIO = 0.9  # share of sample values that must parse for a text column to count as a date
+
+def create_fallback_dashboard_config(df, query: str) -> dict:
+    """Create a fallback dashboard configuration when LLM fails, classifying columns by dtype."""
+    import pandas as pd
     logger.info("Creating fallback dashboard configuration")
     
     # Analyze column types
-    numeric_cols = []
-    categorical_cols = []
-    date_cols = []
-    
-    for col in columns:
-        col_lower = col.lower()
-        if any(word in col_lower for word in ['amount', 'price', 'cost', 'value', 'total', 'sum', 'quantity', 'qty', 'score', 'rate', 'bpm']):
-            numeric_cols.append(col)
-        elif any(word in col_lower for word in ['date', 'time', 'year', 'month', 'day', 'timestamp']):
-            date_cols.append(col)
-        else:
-            categorical_cols.append(col)
+    columns = df.columns.tolist()
+    numeric_cols = df.select_dtypes(include='number').columns.tolist()
+    date_cols = df.select_dtypes(include='datetime').columns.tolist()
+    date_cols += [col for col in numeric_cols if pd.api.types.is_integer_dtype(df[col]) and _DATE_NAME_RE.search(str(col))]
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")  # format-inference warnings for non-date text
+        for col in df.select_dtypes(include='object').columns:
+            values = df[col].dropna()
+            if len(values) and pd.to_datetime(values, errors='coerce').notna().mean() > DATE_PARSE_RATIO:
+                date_cols.append(col)
+    id_cols = {col for col in numeric_cols if pd.api.types.is_integer_dtype(df[col]) and _ID_NAME_RE.search(str(col))}
+    numeric_cols = [col for col in numeric_cols if col not in date_cols and col not in id_cols]
+    # Identifiers last, so a real category is preferred as the chart axis
+    categorical_cols = sorted((col for col in columns if col not in numeric_cols and col not in date_cols),
+                              key=lambda col: col in id_cols)
     
     # Create basic visuals based on query and available columns
     visuals = []
     
     # Determine visual types from query
-    query_lower = query.lower()
-    wants_bar = 'bar' in query_lower or 'column' in query_lower
-    wants_line = 'line' in query_lower or 'trend' in query_lower
-    wants_pie = 'pie' in query_lower or 'donut' in query_lower
+    intents = {match.lower() for match in _INTENT_RE.findall(query)}
+    wants_bar = 'bar' in intents or 'column' in intents
+    wants_line = 'line' in intents or 'trend' in intents
+    wants_pie = 'pie' in intents or 'donut' in intents
     
     # Add bar chart if requested or as default
     if (wants_bar or not (wants_line or wants_pie)) and categorical_cols and numeric_cols:
@@ -226,12 +530,15 @@ def create_fallback_dashboard_config(columns: list, query: str) -> dict:
         "slicers": date_cols + categorical_cols[:2]  # Add up to 2 categorical slicers plus date slicers
     }
 
+# M text literals escape a double quote by doubling it; backslashes are literal (JSON escaping happens at serialization)
+_M_STRING_ESCAPE = str.maketrans({'"': '""'})
+
 def create_powerbi_template_file(output_dir: str, project_name: str, csv_path: str, plan: dict) -> str:
     """Create a Power BI template file that opens CSV data directly."""
     
     # Generate Power BI M Query for CSV import
     csv_name = os.path.basename(csv_path)
-    csv_full_path = os.path.abspath(csv_path).replace('\\', '\\\\')  # Escape backslashes for M query
+    csv_full_path = os.path.abspath(csv_path).translate(_M_STRING_ESCAPE)  # Escape for an M text literal
     
     # Create M Query string
     m_query = f'''let
@@ -248,13 +555,19 @@ in
     template_path = os.path.join(output_dir, f"{project_name}.pbit")
     
     try:
+        import io
+        import zipfile
         # Create the .pbit file (which is essentially a zip file)
-        with zipfile.ZipFile(template_path, 'w', zipfile.ZIP_DEFLATED) as pbit_zip:
+        # Fast deflate for the data model; the fixed parts are a few bytes each and stored as-is.
+        # The archive is assembled in memory and written to disk with a single write.
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED, compresslevel=1) as pbit_zip:
             # Add the main template files
-            pbit_zip.writestr('DataModelSchema', json.dumps(template_content['schema'], indent=2))
-            pbit_zip.writestr('Connections', json.dumps(template_content['connections'], indent=2))
-            pbit_zip.writestr('Report/Layout', json.dumps(template_content['layout'], indent=2))
-            pbit_zip.writestr('Metadata', json.dumps(template_content['metadata'], indent=2))
+            pbit_zip.writestr('DataModelSchema', _json_dumps_pretty(template_content['schema']))
+            for name, data in _pbit_static_entries():
+                pbit_zip.writestr(name, data, compress_type=zipfile.ZIP_STORED)
+        with open(template_path, 'wb') as f:
+            f.write(buffer.getbuffer())
             
         logger.info(f"Power BI template created at: {template_path}")
         return template_path
@@ -267,7 +580,7 @@ def create_instruction_file(output_dir: str, project_name: str, csv_path: str, p
     """Create an instruction file with manual steps if PBIT creation fails."""
     instruction_file = os.path.join(output_dir, f"{project_name}_Instructions.txt")
     
-    instructions = f"""Power BI Dashboard Creation Instructions
+    header = f"""Power BI Dashboard Creation Instructions
 ======================================
 
 CSV File: {csv_path}
@@ -283,27 +596,28 @@ MANUAL STEPS TO CREATE DASHBOARD:
 RECOMMENDED VISUALS:
 """
     
-    for i, visual in enumerate(plan.get('visuals', []), 1):
+    parts = [header]
+    for i, visual in enumerate(plan.get('visuals') or (), 1):
         visual_type = visual.get('type', 'bar').title()
         x_field = visual.get('x_field', '')
         y_field = visual.get('y_field', '')
         aggregation = visual.get('aggregation', 'sum').title()
         
-        instructions += f"""
+        parts.append(f"""
 {i}. {visual_type} Chart:
    - Drag '{x_field}' to Axis/Category
    - Drag '{y_field}' to Values
    - Aggregation: {aggregation}
-"""
+""")
     
-    if plan.get('slicers'):
-        instructions += f"""
+    slicers = plan.get('slicers')
+    if slicers:
+        parts.append("""
 RECOMMENDED SLICERS:
-"""
-        for slicer in plan.get('slicers', []):
-            instructions += f"- {slicer}\n"
+""")
+        parts.extend(f"- {slicer}\n" for slicer in slicers)
     
-    instructions += f"""
+    parts.append(f"""
 NOTES:
 - All files have been prepared in: {output_dir}
 - The CSV data should load automatically when you follow these steps
@@ -312,7 +626,8 @@ NOTES:
 
 For automatic dashboard creation, ensure you have the latest Power BI Desktop version
 and that all file paths are accessible.
-"""
+""")
+    instructions = "".join(parts)
     
     with open(instruction_file, 'w', encoding='utf-8') as f:
         f.write(instructions)
@@ -320,11 +635,36 @@ and that all file paths are accessible.
     logger.info(f"Instruction file created at: {instruction_file}")
     return instruction_file
 
+# Template parts that never depend on the CSV or the plan
+_PBIT_CONNECTIONS = []
+_PBIT_LAYOUT = {
+    'sections': [
+        {
+            'name': 'ReportSection',
+            'displayName': 'Page 1',
+            'visualContainers': []
+        }
+    ]
+}
+_PBIT_METADATA = {
+    'version': '1.0',
+    'template': True
+}
+
+@lru_cache(maxsize=1)
+def _pbit_static_entries() -> tuple:
+    """Serialized (zip entry, bytes) pairs for the fixed template parts, encoded once per process."""
+    return (
+        ('Connections', _json_dumps_pretty(_PBIT_CONNECTIONS)),
+        ('Report/Layout', _json_dumps_pretty(_PBIT_LAYOUT)),
+        ('Metadata', _json_dumps_pretty(_PBIT_METADATA)),
+    )
+
 def create_pbit_template(csv_name: str, m_query: str, plan: dict) -> dict:
     """Create a basic Power BI template structure."""
     table_name = os.path.splitext(csv_name)[0]
     
-    # Basic template structure
+    # Basic template structure; only the data model varies per dashboard
     template = {
         'schema': {
             'version': '2.0',
@@ -341,29 +681,43 @@ def create_pbit_template(csv_name: str, m_query: str, plan: dict) -> dict:
                 ]
             }
         },
-        'connections': [],
-        'layout': {
-            'sections': [
-                {
-                    'name': 'ReportSection',
-                    'displayName': 'Page 1',
-                    'visualContainers': []
-                }
-            ]
-        },
-        'metadata': {
-            'version': '1.0',
-            'template': True
-        }
+        'connections': _PBIT_CONNECTIONS,
+        'layout': _PBIT_LAYOUT,
+        'metadata': _PBIT_METADATA
     }
     
     return template
 
+DASHBOARD_DIR_PREFIX = "powerbi_dashboard_"
+DASHBOARD_MAX_AGE = 24 * 60 * 60  # seconds
+
+def prune_old_dashboards(max_age: float = DASHBOARD_MAX_AGE) -> None:
+    """Remove dashboard temp directories older than max_age so they don't pile up in the temp dir."""
+    cutoff = time.time() - max_age
+    try:
+        with os.scandir(tempfile.gettempdir()) as entries:
+            for entry in entries:
+                if entry.name.startswith(DASHBOARD_DIR_PREFIX) and entry.is_dir(follow_symlinks=False) \
+                        and entry.stat(follow_symlinks=False).st_mtime < cutoff:
+                    shutil.rmtree(entry.path, ignore_errors=True)
+    except OSError as e:
+        logger.warning(f"Could not prune old dashboards: {str(e)}")
+
+def launch_detached(args: list):
+    """Start a GUI process without waiting for it, so it outlives this call (and the interpreter)."""
+    import subprocess
+    kwargs = {"stdout": subprocess.DEVNULL, "stderr": subprocess.DEVNULL}
+    if platform.system() == "Windows":
+        kwargs["creationflags"] = subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP
+    else:
+        kwargs["close_fds"] = True
+    return subprocess.Popen(args, **kwargs)
+
 def open_powerbi_with_csv(csv_path: str, pbi_path: str) -> bool:
     """Try to open Power BI Desktop and let user manually import CSV."""
     try:
         # Just open Power BI Desktop - user will manually load CSV
-        subprocess.Popen([pbi_path])
+        launch_detached([pbi_path])
         logger.info("Power BI Desktop opened. Please manually import your CSV file.")
         return True
     except Exception as e:
@@ -382,6 +736,9 @@ def powerbi_generate_dashboard(csv_file: str, query: str) -> tuple[bool, str]:
         tuple[bool, str]: (success, result message or error)
     """
     try:
+        if not _ensure_env():
+            return False, f"Error: .env file not found at {env_path}"
+        
         # Check Power BI installation
         pbi_installed, pbi_path = check_powerbi_installation()
         if not pbi_installed:
@@ -402,109 +759,68 @@ def powerbi_generate_dashboard(csv_file: str, query: str) -> tuple[bool, str]:
         
         logger.info(f"Generating Power BI dashboard for CSV: {csv_path} with query: {query}")
         
-        # Analyze CSV with encoding fallbacks
-        df = None
-        encodings = ['utf-8', 'latin1', 'iso-8859-1', 'windows-1252']
-        for encoding in encodings:
-            try:
-                df = pd.read_csv(csv_path, encoding=encoding)
-                logger.info(f"Successfully read CSV with encoding: {encoding}")
-                break
-            except UnicodeDecodeError as e:
-                logger.warning(f"Failed to read CSV with encoding {encoding}: {str(e)}")
-                continue
-        
-        if df is None:
-            logger.error("Failed to read CSV with any encoding. Trying with errors='replace'.")
-            try:
-                df = pd.read_csv(csv_path, encoding='utf-8', errors='replace')
-                logger.info("Read CSV with errors='replace'.")
-            except Exception as e:
-                logger.error(f"Failed to read CSV: {str(e)}")
-                return False, f"Error reading CSV: {str(e)}"
+        # Analyze CSV header and sample rows with the sniffed encoding; the full file is never parsed
+        import pandas as pd  # deferred: only needed once a dashboard is actually generated
+        encoding = detect_csv_encoding(csv_path)
+        try:
+            df = pd.read_csv(
+                csv_path,
+                encoding=encoding,
+                encoding_errors='replace',
+                nrows=CSV_SAMPLE_ROWS,
+                engine='c',
+                on_bad_lines='skip'
+            )
+            logger.info(f"Successfully read CSV with encoding: {encoding}")
+        except Exception as e:
+            logger.error(f"Failed to read CSV: {str(e)}")
+            return False, f"Error reading CSV: {str(e)}"
         
         columns = df.columns.tolist()
-        sample_data = df.head(3).to_dict(orient='records')  # Reduced sample size
-        logger.debug(f"CSV columns: {columns}, Sample data: {sample_data}")
-        
-        # Construct improved prompt for LLM
-        prompt = f"""
-You are a Power BI expert. Generate a JSON configuration for a dashboard based on this request.
-
-User Query: "{query}"
-CSV Columns: {columns}
-Sample Data: {sample_data}
-
-Return ONLY a valid JSON object with this exact structure:
-{{
-  "visuals": [
-    {{
-      "type": "bar",
-      "x_field": "column_name",
-      "y_field": "column_name", 
-      "aggregation": "sum",
-      "filters": {{}}
-    }}
-  ],
-  "slicers": ["column_name1", "column_name2"]
-}}
-
-Visual types: bar, line, pie, card
-Aggregations: sum, count, avg, min, max
-Choose appropriate fields from the available columns.
-Return only the JSON, no explanation.
-"""
+        schema = describe_columns(df)
+        logger.debug(f"CSV schema: {schema}")
         
-        # Call LLM with retry logic
-        response = None
-        plan = None
+        # Only the dataset and query vary between calls; the instructions go in the system message
+        prompt = json.dumps({"query": query, "schema": schema}, ensure_ascii=False)
         
-        for attempt in range(3):
-            logger.info(f"Attempting LLM call #{attempt + 1}")
-            
-            if grok_api_key and not response:
-                response = call_grok(prompt, grok_api_key)
-                if response:
-                    cleaned = clean_llm_response(response)
-                    if cleaned:
-                        try:
-                            plan = json.loads(cleaned)
-                            logger.info("Successfully parsed Grok response")
-                            break
-                        except json.JSONDecodeError as e:
-                            logger.warning(f"Grok JSON decode error: {str(e)}")
-                            response = None
-            
-            if gemini_api_key and not plan:
-                response = call_gemini(prompt, gemini_api_key)
-                if response:
-                    cleaned = clean_llm_response(response)
-                    if cleaned:
-                        try:
-                            plan = json.loads(cleaned)
-                            logger.info("Successfully parsed Gemini response")
-                            break
-                        except json.JSONDecodeError as e:
-                            logger.warning(f"Gemini JSON decode error: {str(e)}")
-                            response = None
+        # Call LLM with retry logic, unless this request was already answered in this process or a previous run
+        disk_cache = open_disk_cache(PLAN_DISK_CACHE_DIR)
+        disk_key = _plan_cache_key(columns, query)
+        plan = _PLAN_CACHE.get(columns, query)
+        if plan is None and disk_cache is not None:
+            plan = disk_cache.get(disk_key)
+            if plan is not None:
+                _PLAN_CACHE.put(columns, query, plan)
+        if plan is not None:
+            logger.info("Using cached dashboard plan")
+        else:
+            plan = request_dashboard_plan(prompt, columns, grok_api_key, gemini_api_key)
+            if plan:
+                _PLAN_CACHE.put(columns, query, plan)
+                if disk_cache is not None:
+                    disk_cache.set(disk_key, dict(plan), expire=PLAN_DISK_CACHE_TTL)
         
         # Use fallback if LLM failed
         if not plan:
             logger.warning("LLM parsing failed after all retries. Using fallback configuration.")
-            plan = create_fallback_dashboard_config(columns, query)
+            plan = create_fallback_dashboard_config(df, query)
         
         # Add the query to the plan for instruction generation
         plan['query'] = query
         
         logger.info(f"Dashboard plan: {plan}")
         
-        # Create temporary directory for dashboard
-        output_dir = tempfile.mkdtemp(prefix="powerbi_dashboard_")
+        # Create temporary directory for dashboard, clearing out ones left by earlier runs
+        prune_old_dashboards()
+        output_dir = tempfile.mkdtemp(prefix=DASHBOARD_DIR_PREFIX)
         dashboard_name = f"auto_dashboard_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
         
-        # Copy CSV to output directory for easier access
+        # Link (or copy, across filesystems) the CSV into the output directory; Power BI only reads it
         csv_copy_path = os.path.join(output_dir, os.path.basename(csv_path))
-        shutil.copy2(csv_path, csv_copy_path)
+        try:
+            os.link(csv_path, csv_copy_path)
+        except OSError:
+            shutil.copyfile(csv_path, csv_copy_path)
         logger.info(f"CSV copied to: {csv_copy_path}")
         
         # Create template or instruction file
@@ -529,8 +845,12 @@ Return only the JSON, no explanation.
         if pbi_installed:
             try:
                 if result_file.endswith('.pbit'):
-                    # Try to open the template file directly
-                    subprocess.run([pbi_path, result_file], check=False)
+                    # Try to open the template file directly; don't block until Power BI exits.
+                    # ShellExecute hands .pbit to its registered handler (Power BI) and returns at once.
+                    if hasattr(os, 'startfile'):
+                        os.startfile(result_file)
+                    else:
+                        launch_detached([pbi_path, result_file])
                     success_message += "\nTemplate opened in Power BI Desktop."
                 else:
                     # Just open Power BI Desktop
@@ -549,6 +869,8 @@ Return only the JSON, no explanation.
 
 if __name__ == "__main__":
     # Ensure environment variables are loaded
+    if not _ensure_env():
+        sys.exit(1)
     grok_api_key = os.getenv("GROQ_API_KEY3")
     gemini_api_key = os.getenv("GEMINI_API_KEY3")
     if not grok_api_key and not gemini_api_key:
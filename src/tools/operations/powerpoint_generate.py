@@ -10,6 +10,7 @@ import re
 from dotenv import load_dotenv
 import platform
 import subprocess
+import hashlib
 
 # Suppress syntax warnings
 warnings.filterwarnings("ignore", category=SyntaxWarning)
@@ -44,6 +45,8 @@ except ImportError:
             root_dir = os.path.dirname(root_dir)
         return current_dir  # Fallback to script's directory if no marker found
 
+from common_functions.LLM_utils import open_disk_cache, race_providers
+
 logger = setup_logger()
 PROJECT_ROOT = find_project_root()
 
@@ -55,6 +58,11 @@ if not os.path.exists(env_path):
 load_dotenv(env_path)
 logger.info(f"Loaded .env file from {env_path}")
 
+LLM_CALL_TIMEOUT = 30  # seconds per round before giving up on both providers
+LLM_MAX_TOKENS = 900  # ample for 5-10 slides of short bullets in the JSON schema
+CONTENT_CACHE_TTL = 14 * 24 * 60 * 60  # seconds
+CONTENT_CACHE_DIR = os.path.join(PROJECT_ROOT, '.cache', 'ppt_llm')  # generated slide content persisted across runs
+
 def check_powerpoint_installation():
     """Check if Microsoft PowerPoint is installed on the system."""
     try:
@@ -87,8 +95,11 @@ def call_grok(prompt: str, api_key: str) -> str:
         response = client.chat.completions.create(
             model="llama-3.3-70b-versatile",
             messages=[{"role": "user", "content": prompt}],
-            max_tokens=1500,
-            temperature=0.3
+            max_tokens=LLM_MAX_TOKENS,
+            temperature=0.0,
+            top_p=1.0,
+            frequency_penalty=0.0,
+            presence_penalty=0.0
         )
         return response.choices[0].message.content
     except Exception as e:
@@ -100,7 +111,10 @@ def call_gemini(prompt: str, api_key: str) -> str:
     try:
         import google.generativeai as genai
         genai.configure(api_key=api_key)
-        model = genai.GenerativeModel("gemini-1.5-flash-latest")
+        model = genai.GenerativeModel(
+            "gemini-1.5-flash-latest",
+            generation_config=genai.GenerationConfig(temperature=0.0, top_p=1.0, max_output_tokens=LLM_MAX_TOKENS)
+        )
         response = model.generate_content(prompt)
         return response.text
     except Exception as e:
@@ -129,6 +143,21 @@ def clean_llm_response(response: str) -> str:
     logger.warning(f"No JSON found in response: {response[:200]}...")
     return None
 
+def _parse_content(response: str) -> dict:
+    """Turn a raw LLM reply into presentation content, or None."""
+    cleaned = clean_llm_response(response)
+    return json.loads(cleaned) if cleaned else None
+
+def request_presentation_content(prompt: str, grok_api_key: str, gemini_api_key: str, attempts: int = 2) -> dict:
+    """Query Grok and Gemini concurrently and return the first reply that parses."""
+    return race_providers(
+        [("Grok", call_grok, grok_api_key), ("Gemini", call_gemini, gemini_api_key)],
+        prompt,
+        _parse_content,
+        timeout=LLM_CALL_TIMEOUT,
+        attempts=attempts
+    )
+
 def create_fallback_presentation_content(query: str) -> dict:
     """Create fallback presentation content when LLM fails."""
     logger.info("Creating fallback presentation content")
@@ -231,38 +260,16 @@ Generate 5-10 slides with concise bullet points.
 Return only the JSON, no explanation.
 """
         
-        # Call LLM with retry logic
-        response = None
-        content = None
-        
-        for attempt in range(3):
-            logger.info(f"Attempting LLM call #{attempt + 1}")
-            
-            if grok_api_key and not response:
-                response = call_grok(prompt, grok_api_key)
-                if response:
-                    cleaned = clean_llm_response(response)
-                    if cleaned:
-                        try:
-                            content = json.loads(cleaned)
-                            logger.info("Successfully parsed Grok response")
-                            break
-                        except json.JSONDecodeError as e:
-                            logger.warning(f"Grok JSON decode error: {str(e)}")
-                            response = None
-            
-            if gemini_api_key and not content:
-                response = call_gemini(prompt, gemini_api_key)
-                if response:
-                    cleaned = clean_llm_response(response)
-                    if cleaned:
-                        try:
-                            content = json.loads(cleaned)
-                            logger.info("Successfully parsed Gemini response")
-                            break
-                        except json.JSONDecodeError as e:
-                            logger.warning(f"Gemini JSON decode error: {str(e)}")
-                            response = None
+        # Reuse content generated for the same prompt; otherwise call Grok and Gemini concurrently
+        cache = open_disk_cache(CONTENT_CACHE_DIR)
+        prompt_hash = hashlib.sha256(prompt.encode('utf-8')).hexdigest()
+        content = cache.get(prompt_hash) if cache is not None else None
+        if content is not None:
+            logger.info("Using cached presentation content")
+        else:
+            content = request_presentation_content(prompt, grok_api_key, gemini_api_key)
+            if content and cache is not None:
+                cache.set(prompt_hash, content, expire=CONTENT_CACHE_TTL)
         
         # Use fallback if LLM failed
         if not content:
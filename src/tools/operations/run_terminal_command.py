@@ -4,6 +4,21 @@ import os
 import platform
 import re
 
+# Natural language indicators, fused into one alternation so the input is scanned once
+_NL_RE = re.compile('|'.join(f'(?:{p})' for p in (
+    r'\b(please|can you|could you|would you|i want|i need|help me)\b',
+    r'\b(create a|make a|generate|produce)\b',
+    r'\b(file called|folder called|directory called)\b',
+    r'\b(to the|from the|in the|on the)\b',
+    r'\b(and then|after that|next)\b',
+    r'\.(txt|pdf|docx|xlsx)\s+to\s+',  # "rename file.txt to newname.txt"
+    r'\bmatch(ing)?\s+(file|files|path)\b'
+)))
+_QUESTION_WORDS = frozenset({'what', 'how', 'why', 'when', 'where', 'which'})
+_WORD_RE = re.compile(r'[a-z]+')
+_RENAME_RE = re.compile(r'\brename\s+', re.IGNORECASE)
+_TO_RE = re.compile(r'\s+to\s+', re.IGNORECASE)
+
 def run_command(command: str):
     """
     Run a Windows shell command and return its output and error if any.
@@ -77,19 +92,8 @@ def _is_natural_language(command: str) -> bool:
     command_lower = command.strip().lower()
     
     # Natural language indicators
-    natural_language_patterns = [
-        r'\b(please|can you|could you|would you|i want|i need|help me)\b',
-        r'\b(create a|make a|generate|produce)\b',
-        r'\b(file called|folder called|directory called)\b',
-        r'\b(to the|from the|in the|on the)\b',
-        r'\b(and then|after that|next)\b',
-        r'\.(txt|pdf|docx|xlsx)\s+to\s+',  # "rename file.txt to newname.txt"
-        r'\bmatch(ing)?\s+(file|files|path)\b'
-    ]
-    
-    for pattern in natural_language_patterns:
-        if re.search(pattern, command_lower):
-            return True
+    if _NL_RE.search(command_lower):
+        return True
     
     # Check if command starts with common Windows commands
     valid_command_starts = [
@@ -105,7 +109,7 @@ def _is_natural_language(command: str) -> bool:
         return False
     
     # If contains question words or long sentences, likely natural language
-    if any(word in command_lower for word in ['what', 'how', 'why', 'when', 'where', 'which']):
+    if not _QUESTION_WORDS.isdisjoint(_WORD_RE.findall(command_lower)):
         return True
     
     # If more than 8 words, likely natural language
@@ -151,12 +155,12 @@ def _fix_windows_command(command: str) -> str:
     # Handle specific problematic patterns
     if 'rename ' in command.lower():
         # Convert "rename old_file new_file" to "ren old_file new_file"
-        command = re.sub(r'\brename\s+', 'ren ', command, flags=re.IGNORECASE)
+        command = _RENAME_RE.sub('ren ', command)
     
     # Fix "file.txt to newfile.txt" pattern
     if ' to ' in command.lower():
         # Convert "ren file.txt to newfile.txt" to "ren file.txt newfile.txt"
-        command = re.sub(r'\s+to\s+', ' ', command, flags=re.IGNORECASE)
+        command = _TO_RE.sub(' ', command)
     
     # Handle file paths with spaces - ensure they're quoted
     if ' ' in command and not ('"' in command or "'" in command):
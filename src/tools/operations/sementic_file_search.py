@@ -1,84 +1,242 @@
 import os
-import glob
+
+# Threads for the CPU-bound encode/search; AI_ASSISTANT_SINGLE_THREADED=1 pins everything to one (e.g. for CI).
+# Set before numpy/torch/faiss load so their OpenMP runtimes pick it up.
+NUM_THREADS = 1 if os.getenv('AI_ASSISTANT_SINGLE_THREADED') else (os.cpu_count() or 1)
+os.environ.setdefault('OMP_NUM_THREADS', str(NUM_THREADS))
+
+import re
+import threading
 from typing import List, Dict, Tuple
 from sentence_transformers import SentenceTransformer
 import faiss
 import numpy as np
-from PyPDF2 import PdfReader
-from docx import Document
+import json
+import hashlib
 import pickle  # For saving/loading index
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
+from common_functions.Extract_text import extract_text_from_file
+
+faiss.omp_set_num_threads(NUM_THREADS)
+try:
+    import torch
+    torch.set_num_threads(NUM_THREADS)
+    torch.set_num_interop_threads(1)
+except (ImportError, RuntimeError):
+    pass  # No torch (ONNX-only install), or its thread pools were already started elsewhere
 
 # Supported file extensions
 SUPPORTED_EXTS = ['.pdf', '.docx', '.txt']
+# Directories never descended into while indexing (hidden directories are skipped too)
+EXCLUDE_DIRS = {'AppData', 'Program Files', 'Windows', '.cache', '.local'}
+
+# Index selection by corpus size: exact flat search below HNSW_MIN_VECTORS, an HNSW graph
+# (uncompressed vectors, fast search) up to IVF_MIN_VECTORS, compressed IVF-PQ beyond that
+HNSW_MIN_VECTORS = 10_000
+IVF_MIN_VECTORS = 1_000_000
+HNSW_EF_CONSTRUCTION = 200
+HNSW_EF_SEARCH = 64
+# Chunks per encode call; bounds the transient per-call output while filling the preallocated matrix
+ENCODE_BLOCK = 2048
+# Chunk hits fetched per requested file result, before reducing to one hit per file
+SEARCH_OVERFETCH = 4
+# Inverted lists probed per query; higher trades speed for recall
+IVF_NPROBE = 16
+# Dynamically int8-quantized ONNX export published alongside the MiniLM weights on the HF hub
+ONNX_QINT8_FILE = 'onnx/model_qint8_avx512_vnni.onnx'
+# Below this many files extraction runs in-process; worker start-up would cost more than it saves
+EXTRACT_PROCESS_MIN_FILES = 32
+EXTRACT_MAX_WORKERS = min(8, NUM_THREADS)
+
+
+def load_embedding_model(model_name: str) -> SentenceTransformer:
+    """
+    Load the embedding model on the int8 ONNX Runtime backend, falling back to
+    PyTorch when onnxruntime/optimum (or the quantized export) is unavailable.
+    """
+    try:
+        return SentenceTransformer(model_name, backend='onnx', model_kwargs={'file_name': ONNX_QINT8_FILE})
+    except Exception as e:
+        print(f"ONNX backend unavailable for {model_name}, using PyTorch: {e}")
+        return SentenceTransformer(model_name)
+
 
 class OSFileSearcher:
     def __init__(self, model_name: str = 'all-MiniLM-L6-v2'):
         """
         Initialize the searcher with a sentence transformer model for embeddings.
         """
-        self.model = SentenceTransformer(model_name)
+        self.model = load_embedding_model(model_name)
         self.index = None
         self.file_metadata = []  # List of (file_path, title, chunks)
+        self.root_dir = None  # Directory the current index covers
         self.dimension = 384  # Default embedding dim for MiniLM
+        # Pay the first-forward cost (tokenizer load, allocator/graph warm-up) off the query path
+        self._warmup_thread = threading.Thread(target=self._warmup, daemon=True)
+        self._warmup_thread.start()
+
+    def _warmup(self) -> None:
+        try:
+            self.model.encode(["warmup"], convert_to_numpy=True)
+        except Exception as e:
+            print(f"Model warm-up failed: {e}")
+
+    def _wait_for_warmup(self) -> None:
+        """
+        Block until the warm-up encode has finished; the tokenizer is not safe to share
+        between concurrent encode calls.
+        """
+        self._warmup_thread.join()
 
     def extract_text_from_file(self, file_path: str) -> str:
         """
         Extract text from a supported file.
         """
-        ext = os.path.splitext(file_path)[1].lower()
-        try:
-            if ext == '.pdf':
-                reader = PdfReader(file_path)
-                text = ''.join(page.extract_text() or '' for page in reader.pages)
-            elif ext == '.docx':
-                doc = Document(file_path)
-                text = '\n'.join(para.text for para in doc.paragraphs)
-            elif ext == '.txt':
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    text = f.read()
-            else:
-                return ''
-            if not isinstance(text, str):
-                print(f"Non-string text extracted from {file_path}: {type(text)}")
-                return ''
-            text = ''.join(c for c in text if c.isprintable() or c.isspace())
-            if not text.strip():
-                print(f"No valid text after cleaning from {file_path}")
-                return ''
-            print(f"Extracted {len(text)} characters from {file_path}")
-            return text
-        except Exception as e:
-            print(f"Error extracting text from {file_path}: {e}")
-            return ''
+        return extract_text_from_file(file_path)
 
-    def chunk_text(self, text: str, chunk_size: int = 500) -> List[str]:
+    def chunk_text(self, text: str, chunk_size: int = 200, overlap: int = 40) -> List[str]:
         """
         Split text into overlapping chunks for better semantic coverage.
+        Consecutive chunks share `overlap` words, so the window advances by chunk_size - overlap.
         """
         words = text.split()
+        step = max(chunk_size - overlap, 1)
         chunks = []
-        for i in range(0, len(words), chunk_size):
-            chunk = ' '.join(words[i:i + chunk_size])
-            chunks.append(chunk)
+        for i in range(0, len(words), step):
+            chunks.append(' '.join(words[i:i + chunk_size]))
+            if i + chunk_size >= len(words):
+                break  # This window already reached the end; another would be a pure subset
         return chunks
 
+    def _encode_chunks(self, chunks: List[str]) -> np.ndarray:
+        """
+        Encode chunks in length-sorted order so each batch pads to similar lengths, writing
+        each block straight into its original rows of one preallocated float32 matrix,
+        then L2-normalize the matrix in place.
+        """
+        self._wait_for_warmup()
+        order = np.argsort([len(c.split()) for c in chunks], kind='stable')
+        embeddings = np.empty((len(chunks), self.dimension), dtype='float32')
+        for start in range(0, len(chunks), ENCODE_BLOCK):
+            rows = order[start:start + ENCODE_BLOCK]
+            embeddings[rows] = self.model.encode([chunks[i] for i in rows], batch_size=64,
+                                                 convert_to_numpy=True)
+        # One SIMD pass over the whole matrix so inner product == cosine
+        faiss.normalize_L2(embeddings)
+        return embeddings
+
+    def _build_faiss_index(self, embeddings: np.ndarray):
+        """
+        Build an inner-product index sized to the corpus: exact flat search for small
+        corpora, HNSW for mid-sized ones, IVF-PQ (compressed, coarse-quantized) past IVF_MIN_VECTORS.
+        """
+        n = len(embeddings)
+        if n < HNSW_MIN_VECTORS:
+            index = faiss.IndexFlatIP(self.dimension)
+        elif n < IVF_MIN_VECTORS:
+            index = faiss.index_factory(self.dimension, "HNSW32", faiss.METRIC_INNER_PRODUCT)
+            index.hnsw.efConstruction = HNSW_EF_CONSTRUCTION
+        else:
+            nlist = min(4096, n // 39)
+            index = faiss.index_factory(self.dimension, f"IVF{nlist},PQ48", faiss.METRIC_INNER_PRODUCT)
+            index.train(embeddings)
+        index.add(embeddings)
+        return index
+
+    def _read_manifest(self, save_path: str):
+        """
+        Manifest of the build persisted under save_path, or None when that build is
+        incomplete or unreadable. Cheap enough to check before touching the index itself.
+        """
+        if not all(os.path.exists(save_path + suffix) for suffix in ('_index.faiss', '_metadata.pkl', '_manifest.json')):
+            return None
+        try:
+            with open(save_path + '_manifest.json', 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"Ignoring unreadable previous manifest at {save_path}: {e}")
+            return None
+
+    def _load_previous_build(self, save_path: str, stale: set):
+        """
+        Reuse the index persisted under save_path, dropping vectors of the stale files (changed
+        or disappeared since its manifest was written). Returns (index, metadata), or None when
+        there is nothing usable and a full rebuild is needed.
+        """
+        try:
+            index = faiss.read_index(save_path + '_index.faiss')
+            with open(save_path + '_metadata.pkl', 'rb') as f:
+                metadata = pickle.load(f)
+        except Exception as e:
+            print(f"Ignoring unreadable previous index at {save_path}: {e}")
+            return None
+
+        if stale:
+            # Only flat indexes renumber ids on removal, which keeps metadata positions aligned
+            if not isinstance(index, faiss.IndexFlat):
+                return None
+            drop = [i for i, m in enumerate(metadata) if m[0] in stale]
+            if drop:
+                index.remove_ids(np.array(drop, dtype='int64'))
+                metadata = [m for m in metadata if m[0] not in stale]
+        return index, metadata
+
     def build_index(self, root_dir: str, save_path: str = None) -> None:
         """
         Recursively find supported files, extract text, generate embeddings, and build FAISS index.
+        With save_path, files whose (mtime, size) match the previous build's manifest are skipped and
+        only new or modified files are embedded into the persisted index.
         """
-        exclude_dirs = ['AppData', 'Program Files', 'Windows', '.cache', '.local']
-        file_paths = []
-        for ext in SUPPORTED_EXTS:
-            pattern = os.path.join(root_dir, '**', f'*{ext}')
-            for path in glob.glob(pattern, recursive=True):
-                if not any(exclude in path for exclude in exclude_dirs):
-                    file_paths.append(path)
+        # Never keep answering from another directory's index if this build yields nothing
+        self.index = None
+        self.file_metadata = []
+        self.root_dir = root_dir
+        exts = set(SUPPORTED_EXTS)
+        manifest = {}
+        for dirpath, dirnames, filenames in os.walk(root_dir):
+            # Prune in place so os.walk never enters excluded trees
+            dirnames[:] = [d for d in dirnames if d not in EXCLUDE_DIRS and not d.startswith('.')]
+            for filename in filenames:
+                if os.path.splitext(filename)[1].lower() in exts:
+                    path = os.path.join(dirpath, filename)
+                    try:
+                        st = os.stat(path)
+                    except OSError:
+                        continue
+                    manifest[path] = [st.st_mtime_ns, st.st_size]
 
-        embeddings = []
+        index = None
         metadata = []
+        file_paths = list(manifest)
+        old_manifest = self._read_manifest(save_path) if save_path else None
+        if old_manifest is not None:
+            changed = [p for p in file_paths if old_manifest.get(p) != manifest[p]]
+            stale = {path for path, sig in old_manifest.items() if manifest.get(path) != sig}
+            if not changed and not stale:
+                # Nothing to update: go straight to the memory-mapped load
+                print("Index is up to date.")
+                self.load_index(save_path + '_index.faiss', save_path + '_metadata.pkl')
+                return
+            previous = self._load_previous_build(save_path, stale)
+            if previous:
+                index, metadata = previous
+                file_paths = changed
+                print(f"Updating index: {len(file_paths)} new/modified, {len(stale)} stale files.")
+
+        all_chunks = []
+        new_metadata = []
 
-        for file_path in file_paths:
-            text = self.extract_text_from_file(file_path)
+        # Extraction (PDF/DOCX parsing) is CPU-bound and independent per file
+        if len(file_paths) < EXTRACT_PROCESS_MIN_FILES or EXTRACT_MAX_WORKERS == 1:
+            texts = [extract_text_from_file(path) for path in file_paths]
+        else:
+            # Don't fork while the warm-up encode may be inside torch/OpenMP
+            self._wait_for_warmup()
+            with ProcessPoolExecutor(max_workers=EXTRACT_MAX_WORKERS) as executor:
+                texts = list(executor.map(extract_text_from_file, file_paths, chunksize=4))
+
+        for file_path, text in zip(file_paths, texts):
             if not text or not isinstance(text, str) or text.strip() == '':
                 print(f"Skipping {file_path}: No valid text extracted")
                 continue
@@ -88,17 +246,19 @@ class OSFileSearcher:
                 if not chunk.strip():
                     print(f"Skipping empty chunk in {file_path}")
                     continue
-                try:
-                    embedding = self.model.encode(chunk)
-                    embeddings.append(embedding)
-                    metadata.append((file_path, title, chunk[:100] + '...' if len(chunk) > 100 else chunk))
-                except Exception as e:
-                    print(f"Error encoding chunk in {file_path}: {e}")
-                    continue
+                all_chunks.append(chunk)
+                new_metadata.append((file_path, title, chunk[:100] + '...' if len(chunk) > 100 else chunk))
+
+        if all_chunks:
+            embeddings = self._encode_chunks(all_chunks)
+            if index is None:
+                index = self._build_faiss_index(embeddings)
+            else:
+                index.add(embeddings)
+            metadata.extend(new_metadata)
 
-        if embeddings:
-            self.index = faiss.IndexFlatIP(self.dimension)
-            self.index.add(np.array(embeddings).astype('float32'))
+        if index is not None and metadata:
+            self.index = index
             self.file_metadata = metadata
             print(f"Indexed {len(metadata)} chunks from {len(set([m[0] for m in metadata]))} files.")
 
@@ -106,14 +266,17 @@ class OSFileSearcher:
                 faiss.write_index(self.index, save_path + '_index.faiss')
                 with open(save_path + '_metadata.pkl', 'wb') as f:
                     pickle.dump(metadata, f)
+                with open(save_path + '_manifest.json', 'w', encoding='utf-8') as f:
+                    json.dump(manifest, f)
         else:
             print("No valid embeddings generated. Index not created.")
 
     def load_index(self, index_path: str, metadata_path: str) -> None:
         """
         Load pre-built index (for faster startup).
+        The index is memory-mapped read-only, so pages are faulted in on search instead of read upfront.
         """
-        self.index = faiss.read_index(index_path)
+        self.index = faiss.read_index(index_path, faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
         with open(metadata_path, 'rb') as f:
             self.file_metadata = pickle.load(f)
         print(f"Loaded index with {len(self.file_metadata)} chunks.")
@@ -126,66 +289,82 @@ class OSFileSearcher:
         if self.index is None:
             raise ValueError("Index not built. Call build_index() first.")
 
-        query_embedding = self.model.encode([query])
-        scores, indices = self.index.search(query_embedding.astype('float32'), top_k * 10)
+        if hasattr(self.index, 'nprobe'):
+            self.index.nprobe = IVF_NPROBE
+        elif hasattr(self.index, 'hnsw'):
+            self.index.hnsw.efSearch = HNSW_EF_SEARCH
+        self._wait_for_warmup()
+        query_embedding = self.model.encode([query], convert_to_numpy=True).astype('float32')
+        faiss.normalize_L2(query_embedding)
+        scores, indices = self.index.search(query_embedding, top_k * SEARCH_OVERFETCH)
 
-        results = []
-        seen_files = set()
+        # Reduce chunk hits to the best-scoring chunk per file
+        best = {}
         for score, idx in zip(scores[0], indices[0]):
             if idx == -1:
                 continue
+            file_path = self.file_metadata[idx][0]
+            if file_path not in best or score > best[file_path][0]:
+                best[file_path] = (score, idx)
+
+        results = []
+        for score, idx in sorted(best.values(), key=lambda hit: hit[0], reverse=True)[:top_k]:
             file_path, title, snippet = self.file_metadata[idx]
-            if file_path not in seen_files:
-                results.append({
-                    'path': file_path,
-                    'title': title,
-                    'snippet': snippet,
-                    'relevance_score': float(score)
-                })
-                seen_files.add(file_path)
-                if len(results) >= top_k:
-                    break
+            results.append({
+                'path': file_path,
+                'title': title,
+                'snippet': snippet,
+                'relevance_score': float(score)
+            })
 
         return results
 
     def keyword_search(self, query: str, root_dir: str, top_k: int = 5) -> List[Dict]:
         """
-        Simple keyword-based file search (filename or content).
-        Useful for quick OS file finding without full indexing.
+        Simple keyword-based file search (case-insensitive filename match).
+        Useful for quick OS file finding without full indexing; stops walking as soon as top_k files match.
         """
-        pattern = os.path.join(root_dir, '**', f'*{query}*')
-        matches = glob.glob(pattern, recursive=True)
-
+        pattern = re.compile(re.escape(query), re.IGNORECASE)
+        exts = tuple(SUPPORTED_EXTS)
         results = []
-        for match in matches[:top_k * 2]:
-            if any(match.endswith(ext) for ext in SUPPORTED_EXTS):
-                text = self.extract_text_from_file(match)
-                if query.lower() in text.lower() or query.lower() in match.lower():
+        for dirpath, dirnames, filenames in os.walk(root_dir):
+            dirnames[:] = [d for d in dirnames if d not in EXCLUDE_DIRS and not d.startswith('.')]
+            for filename in filenames:
+                if filename.lower().endswith(exts) and pattern.search(filename):
                     results.append({
-                        'path': match,
-                        'title': os.path.basename(match),
-                        'snippet': text[:100] + '...' if text else 'No preview',
+                        'path': os.path.join(dirpath, filename),
+                        'title': filename,
+                        'snippet': 'No preview',
                         'relevance_score': 1.0
                     })
                     if len(results) >= top_k:
-                        break
+                        return results
 
         return results
 
+@lru_cache(maxsize=4)
+def _get_searcher(model_name: str = 'all-MiniLM-L6-v2') -> OSFileSearcher:
+    """
+    Process-wide searcher per model, so the model weights and the loaded index survive between queries.
+    """
+    return OSFileSearcher(model_name)
+
 def sementic_file_search(query: str, root_dir: str = os.path.join(os.path.expanduser('~'), 'Downloads'), use_semantic: bool = True, top_k: int = 3):
     """
     High-level function for your AI assistant to handle file queries.
     Determines if query is semantic (e.g., contains phrases) or keyword-based.
     """
-    searcher = OSFileSearcher()
+    searcher = _get_searcher()
+    root_dir = os.path.abspath(root_dir)
     
-    index_path = os.path.join(os.path.expanduser('~'), '.ai_assistant', 'file_index.faiss')
-    metadata_path = os.path.join(os.path.expanduser('~'), '.ai_assistant', 'file_metadata.pkl')
-    if os.path.exists(index_path):
-        searcher.load_index(index_path, metadata_path)
-    else:
-        os.makedirs(os.path.join(os.path.expanduser('~'), '.ai_assistant'), exist_ok=True)
-        searcher.build_index(root_dir, os.path.join(os.path.expanduser('~'), '.ai_assistant', 'file_index'))
+    if searcher.index is None or searcher.root_dir != root_dir:
+        # build_index appends '_index.faiss' / '_metadata.pkl' / '_manifest.json'; with a persisted
+        # index it only re-embeds files changed since then, or just loads it when nothing changed.
+        # Each root directory gets its own files, so switching roots never invalidates another's index.
+        index_dir = os.path.join(os.path.expanduser('~'), '.ai_assistant')
+        os.makedirs(index_dir, exist_ok=True)
+        root_key = hashlib.sha1(os.path.normcase(root_dir).encode('utf-8')).hexdigest()[:16]
+        searcher.build_index(root_dir, os.path.join(index_dir, f'file_{root_key}'))
     
     if use_semantic and len(query.split()) > 2:
         results = searcher.semantic_search(query, top_k)
@@ -9,7 +9,7 @@ from email.mime.text import MIMEText
 from crewai import Agent, Task, LLM
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
-from google.auth.transport.requests import Request
+from common_functions.Google_service import AUTH_REQUEST
 from google_auth_oauthlib.flow import InstalledAppFlow
 from google.oauth2.credentials import Credentials
 from memory_manager import MemoryManager
@@ -47,7 +47,7 @@ def get_gmail_service(project_root: Optional[str] = None):
 
     if not creds or not creds.valid:
         if creds and creds.expired and creds.refresh_token:
-            creds.refresh(Request())
+            creds.refresh(AUTH_REQUEST)
         else:
             if not os.path.exists(client_secret_file):
                 logger.error("❌ client_secret.json missing in project root")
@@ -2,6 +2,7 @@
 import logging
 import os
 from datetime import datetime
+from functools import lru_cache
 try:
     from common_functions.Find_project_root import find_project_root
 except ImportError as e:
@@ -9,9 +10,12 @@ except ImportError as e:
     def find_project_root():
         return os.path.dirname(os.path.abspath(__file__))
 
-# Configure logger
+# Configure logger (once per process)
+@lru_cache(maxsize=None)
 def setup_logger():
     logger = logging.getLogger("AIAssistant")
+    if getattr(logger, "_configured", False):
+        return logger
     logger.setLevel(logging.DEBUG)  # Capture all log levels
 
     # Avoid duplicate handlers if logger is already configured
@@ -44,4 +48,5 @@ def setup_logger():
             logger.addHandler(file_handler)
         logger.addHandler(console_handler)
 
+    logger._configured = True
     return logger
\ No newline at end of file